@@ -4,17 +4,64 @@
 """
 
 from PIL import Image, ImageDraw, ImageFont
-from typing import Dict, List, Union, Tuple, Optional
-import json
+from typing import Dict, List, Tuple
+import numpy as np
 import os
 import time
 import random
-import tempfile
 from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+# numba 为可选加速依赖，缺失时回退到纯 NumPy 填充
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
 # 修改 PIL 的最大图片尺寸限制
 Image.MAX_IMAGE_PIXELS = None
 
+# 视为"无数据"的单元格取值（0 与 0.0、'0' 与 '0.0' 均视为空）
+_EMPTY_CELL_VALUES = frozenset([None, '', '-', 0, '0', 0.0, '0.0'])
+
+# 单元格边框粗细（像素）
+_BORDER_WIDTH = 2
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _fill_cells_kernel(canvas, rects, colors, border, bw):
+        """
+        并行填充单元格背景与边框的 JIT 内核
+
+        单元格矩形互不重叠，外层循环可以安全地 prange 并行，
+        多核同时写入画布的不同区域（绕开 GIL）
+        """
+        for i in prange(rects.shape[0]):
+            x, y, w, h = rects[i, 0], rects[i, 1], rects[i, 2], rects[i, 3]
+            for c in range(3):
+                canvas[y:y + h, x:x + w, c] = colors[i, c]
+                canvas[y:y + h, x:x + bw, c] = border[c]
+                canvas[y:y + h, x + w - bw:x + w, c] = border[c]
+                canvas[y:y + bw, x:x + w, c] = border[c]
+                canvas[y + h - bw:y + h, x:x + w, c] = border[c]
+else:
+    _fill_cells_kernel = None
+
+@lru_cache(maxsize=64)
+def _load_font(path: str, size: int) -> ImageFont:
+    """
+    按 (字体路径, 字号) 缓存加载字体
+
+    FreeType 字体对象的创建开销在毫秒级，同一个生成器反复生成表格时
+    命中缓存可以免去重复解析字体文件；加载失败时回退到默认字体
+    """
+    try:
+        return ImageFont.truetype(path, size)
+    except:
+        return ImageFont.load_default()
+
 class Cell:
     """
     表格单元格类
@@ -42,7 +89,6 @@ class TableImageGenerator:
     
     Attributes:
         font_path: 字体文件路径配置
-        cell_width: 单元格宽度
         cell_height: 单元格高度
         font_size: 字体大小
         padding: 单元格内边距
@@ -65,8 +111,7 @@ class TableImageGenerator:
             'bold': os.path.join(".", "font", "PingFangSC-Semibold.otf")
         }
         
-        # 基础参数
-        self.cell_width = None  # 将在 _calculate_table_size 中动态计算
+        # 基础参数（72 DPI 基准值，绘制时按目标 DPI 缩放为局部变量）
         self.cell_height = 60   # 单元格高度
         self.font_size = 24     # 字体大小
         self.padding = 20       # 内边距
@@ -88,18 +133,47 @@ class TableImageGenerator:
             '红灯': '#DC2626',  # 红色
             '黄灯': '#D97706'   # 黄色
         }
-        
+
+        # 预先解析颜色为 RGB 元组，避免绘制时逐单元格重复解析
+        self._refresh_color_cache()
+
         # 初始化字体
-        try:
-            self.fonts = {
-                'regular': ImageFont.truetype(self.font_path['regular'], self.font_size),
-                'bold': ImageFont.truetype(self.font_path['bold'], self.font_size)
-            }
-        except:
-            self.fonts = {
-                'regular': ImageFont.load_default(),
-                'bold': ImageFont.load_default()
-            }
+        self.fonts = {
+            'regular': _load_font(self.font_path['regular'], self.font_size),
+            'bold': _load_font(self.font_path['bold'], self.font_size)
+        }
+
+    def __getstate__(self):
+        """序列化时丢弃 FreeType 字体对象（不可 pickle），跨进程传输只带配置"""
+        state = self.__dict__.copy()
+        state.pop('fonts', None)
+        return state
+
+    def __setstate__(self, state):
+        """反序列化后按 font_path 重新加载字体（命中子进程的模块级缓存）"""
+        self.__dict__.update(state)
+        self.fonts = {
+            'regular': _load_font(self.font_path['regular'], self.font_size),
+            'bold': _load_font(self.font_path['bold'], self.font_size)
+        }
+
+    def _refresh_color_cache(self):
+        """
+        将 styles 和 color_mapping 中的十六进制颜色预先转换为 RGB 元组缓存
+
+        绘制大表格时 _draw_cell 会按单元格数量级查询颜色，提前转换可以
+        避免热循环中反复执行十六进制解析。修改 styles 或 color_mapping
+        后需要重新调用本方法刷新缓存
+        """
+        self._styles_rgb = {
+            key: tuple(self._hex_to_rgb(color) for color in value)
+            if isinstance(value, (list, tuple)) else self._hex_to_rgb(value)
+            for key, value in self.styles.items()
+        }
+        self._color_map_rgb = {
+            key: self._hex_to_rgb(value)
+            for key, value in self.color_mapping.items()
+        }
 
     def _hex_to_rgb(self, hex_color: str) -> tuple:
         """
@@ -150,22 +224,34 @@ class TableImageGenerator:
         
         return str(value)
 
-    def _calculate_table_size(self, headers: List[List[Optional[Cell]]], data: List[List[str]]) -> Tuple[int, int]:
-        """计算表格的总宽度和高度"""
-        # 计算表头的实际列数
-        header_cols = 0
-        for row in headers:
-            curr_cols = 0
-            for cell in row:
-                if cell is not None:
-                    curr_cols += cell.colspan
-            header_cols = max(header_cols, curr_cols)
-        
+    def _calculate_table_size(self, hdr_colspans: np.ndarray, data: List[List[str]],
+                              cell_height: int, scale: float = 1.0,
+                              target_width: int = None) -> Tuple[int, int, int, int]:
+        """
+        计算表格的总宽度、总高度和单元格宽度
+
+        Args:
+            hdr_colspans: 表头跨列数矩阵（空位为 0）
+            data: 数据行
+            cell_height: 最终分辨率下的单元格高度
+            scale: DPI 缩放系数，单元格宽度按布局宽度乘以该系数得到
+            target_width: 期望的最终总宽度（像素）。给定时按它反推布局宽度，
+                          使表格直接渲染到目标宽度，省去合成时的重采样
+
+        Returns:
+            (总宽度, 总高度, 单元格宽度, 总列数)，像素值均为最终分辨率
+        """
+        # 计算表头的实际列数（各行跨列数之和的最大值）
+        header_cols = int(hdr_colspans.sum(axis=1).max()) if hdr_colspans.size else 0
+
         # 取表头列数和数据列数的最大值
         total_cols = max(header_cols, max(len(row) for row in data))
         
         # 计算目标总宽度（考虑边距）
-        target_total_width = 1920 - 2 * 40  # 屏幕宽度减去左右边距
+        if target_width is not None:
+            target_total_width = int((target_width - 1) / scale)
+        else:
+            target_total_width = 1920 - 2 * 40  # 屏幕宽度减去左右边距
         
         # 动态计算单元格宽度
         MIN_CELL_WIDTH = 120  # 最小单元格宽度
@@ -174,89 +260,141 @@ class TableImageGenerator:
         # 计算建议的单元格宽度
         suggested_width = target_total_width // total_cols
         
-        # 根据列数调整单元格宽度
-        if suggested_width > MAX_CELL_WIDTH:
-            self.cell_width = MAX_CELL_WIDTH
+        # 根据列数调整单元格宽度；给定 target_width 时表格必须铺满目标宽度
+        # （只保留下限），否则列数较少时会被上限截短、达不到粘贴宽度
+        if target_width is not None:
+            layout_cell_width = max(suggested_width, MIN_CELL_WIDTH)
+        elif suggested_width > MAX_CELL_WIDTH:
+            layout_cell_width = MAX_CELL_WIDTH
         elif suggested_width < MIN_CELL_WIDTH:
-            self.cell_width = MIN_CELL_WIDTH
+            layout_cell_width = MIN_CELL_WIDTH
         else:
-            self.cell_width = suggested_width
-        
+            layout_cell_width = suggested_width
+
+        # 按 DPI 缩放得到最终单元格宽度
+        cell_width = int(layout_cell_width * scale)
+
         # 计算总宽度和高度
-        total_width = total_cols * self.cell_width + 1
-        total_height = (len(headers) + len(data)) * self.cell_height + 1
-        
-        return total_width, total_height
-
-    def _draw_cell(self, draw: ImageDraw, x: int, y: int, cell: Union[Cell, str], 
-                  is_header: bool = False, row_idx: int = 0, 
-                  color_column: str = '', column_name: str = '',
-                  replace_zero: bool = False, highlight: bool = False):
-        """绘制单个单元格"""
-        if isinstance(cell, str):
-            cell = Cell(cell)
-            
-        # 计算合并后的单元格大小
-        width = self.cell_width * cell.colspan
-        height = self.cell_height * cell.rowspan
-        
-        # 处理单元格值
-        cell.text = self._process_value(cell.text, replace_zero=replace_zero)
-        
-        # 设置单元格背景色和边框颜色
-        if is_header:
-            bg_color = self._hex_to_rgb(self.styles['header_color'])
-            text_color = self._hex_to_rgb(self.styles['header_text_color'])
-            font = self.fonts['bold']
-        else:
-            if highlight:
-                bg_color = self._hex_to_rgb(self.styles['summary_color'])
-            else:
-                bg_color = self._hex_to_rgb(self.styles['row_colors'][row_idx % 2])
-            
-            # 设置文字颜色
-            if cell.text == '-':
-                text_color = self._hex_to_rgb(self.styles['empty_text_color'])
-            elif column_name == color_column and cell.text in self.color_mapping:
-                text_color = self._hex_to_rgb(self.color_mapping[cell.text])
-            else:
-                text_color = self._hex_to_rgb(self.styles['text_color'])
-            
-            font = self.fonts['regular']
-        
-        border_color = self._hex_to_rgb(self.styles['border_color'])
-        
-        # 绘制单元格背景
-        draw.rectangle(
-            [(x, y), (x + width, y + height)],
-            fill=bg_color
-        )
-        
-        # 绘制加粗的边框
-        for i in range(2):  # 画2次边框来加粗
-            draw.rectangle(
-                [(x+i, y+i), (x + width-i, y + height-i)],
-                outline=border_color
+        total_width = total_cols * cell_width + 1
+        total_height = (hdr_colspans.shape[0] + len(data)) * cell_height + 1
+
+        return total_width, total_height, cell_width, total_cols
+
+    def _fill_rects(self, canvas: np.ndarray, rects_by_color: Dict, border_color: tuple):
+        """
+        把收集好的单元格矩形按颜色批量写入 NumPy 画布
+
+        表格只有少数几种背景色（表头、两种行色、汇总色），按颜色分组后
+        每种颜色一轮连续的切片赋值，最后统一盖上边框
+
+        Args:
+            rects_by_color: {RGB颜色: [(x, y, 宽, 高), ...]} 的矩形分组
+            border_color: 边框 RGB 颜色
+        """
+        bw = _BORDER_WIDTH
+
+        # 安装了 numba 时把矩形与颜色打平成数组，交给并行 JIT 内核一次写完
+        if _fill_cells_kernel is not None and rects_by_color:
+            rect_list = []
+            color_list = []
+            for bg_color, rects in rects_by_color.items():
+                for rect in rects:
+                    rect_list.append(rect)
+                    color_list.append(bg_color)
+            _fill_cells_kernel(
+                canvas,
+                np.asarray(rect_list, dtype=np.int32),
+                np.asarray(color_list, dtype=np.uint8),
+                np.asarray(border_color, dtype=np.uint8),
+                bw
             )
-        
-        # 计算文本位置使其居中
-        bbox = draw.textbbox((0, 0), cell.text, font=font)
+            return
+
+        # 先填充背景
+        for bg_color, rects in rects_by_color.items():
+            for x, y, width, height in rects:
+                canvas[y:y + height, x:x + width] = bg_color
+
+        # 再盖上边框：四条切片写入直接得到像素对齐的 bw 像素边框，
+        # 所有单元格共用同一边框色
+        for rects in rects_by_color.values():
+            for x, y, width, height in rects:
+                canvas[y:y + height, x:x + bw] = border_color
+                canvas[y:y + height, x + width - bw:x + width] = border_color
+                canvas[y:y + bw, x:x + width] = border_color
+                canvas[y + height - bw:y + height, x:x + width] = border_color
+
+    def _draw_text(self, image: Image, draw: ImageDraw, x: int, y: int,
+                   width: int, height: int, text: str, font: ImageFont, fill: tuple,
+                   bbox_cache: Dict, text_img_cache: Dict):
+        """在单元格范围内居中绘制文本"""
+        # 计算文本尺寸；表格文本重复度极高（'-'、状态值、表头），按
+        # (文本, 字体) 缓存可以把文本排版次数从单元格数降到去重后的字符串数
+        key = (text, id(font))
+        bbox = bbox_cache.get(key)
+        if bbox is None:
+            bbox = draw.textbbox((0, 0), text, font=font)
+            bbox_cache[key] = bbox
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
-        
+
         # 使用负的偏移量使文本稍微上移
         vertical_offset = height * -0.05  # -5% 的单元格高度作为偏移
         text_y = y + (height - text_height) / 2 + vertical_offset
         text_x = x + (width - text_width) / 2
-        
-        # 绘制文本
-        draw.text((text_x, text_y), cell.text, fill=text_color, font=font)
+
+        # 按 (文本, 字体, 颜色) 缓存光栅化结果，重复文本直接贴图，
+        # 免去每次绘制的字形排版与渲染开销
+        tile_key = (text, id(font), fill)
+        tile = text_img_cache.get(tile_key)
+        if tile is None:
+            if text_width <= 0 or text_height <= 0:
+                return
+            tile = Image.new('RGBA', (text_width, text_height), (0, 0, 0, 0))
+            ImageDraw.Draw(tile).text((-bbox[0], -bbox[1]), text, fill=fill, font=font)
+            text_img_cache[tile_key] = tile
+
+        # 贴图位置与 draw.text((text_x, text_y)) 的墨迹位置保持一致
+        image.paste(tile, (int(text_x) + bbox[0], int(text_y) + bbox[1]), tile)
+
+    def _draw_cell(self, fill_rects: Dict, text_ops: List, x: int, y: int,
+                  text: str,
+                  cell_width: int, cell_height: int, fonts: Dict,
+                  rowspan: int = 1, colspan: int = 1,
+                  is_header: bool = False, row_idx: int = 0,
+                  text_color: tuple = None, highlight: bool = False):
+        """计算单元格的矩形与颜色，记录到批量填充和文本队列
+
+        单元格值已在 _build_table_data 中规范化为字符串（空值为 '-'），
+        数据单元格的文字颜色由调用方的按列解析器给出（见 _create_table），
+        这里只负责几何计算和背景选择
+        """
+        # 计算合并后的单元格大小
+        width = cell_width * colspan
+        height = cell_height * rowspan
+
+        # 设置单元格背景色和边框颜色（直接读取预转换的 RGB 缓存）
+        if is_header:
+            bg_color = self._styles_rgb['header_color']
+            text_color = self._styles_rgb['header_text_color']
+            font = fonts['bold']
+        else:
+            if highlight:
+                bg_color = self._styles_rgb['summary_color']
+            else:
+                bg_color = self._styles_rgb['row_colors'][row_idx & 1]
+
+            font = fonts['regular']
+
+        # 矩形按背景色分组，统一批量写入画布；文本同样延后统一绘制
+        fill_rects.setdefault(bg_color, []).append((x, y, width, height))
+        text_ops.append((x, y, width, height, text, font, text_color))
 
     def create_table_image(
         self, data, output_file, columns_order=None, banner_path=None, 
         banner_text=None, color_column='', multi_columns=None, 
         column_display=None, replace_zero=False, 
-        highlight_rules={}
+        highlight_rules=None
     ):
         """
         创建表格图片
@@ -274,60 +412,92 @@ class TableImageGenerator:
         Returns:
             str: 生成的图片路径
         """
+        highlight_rules = highlight_rules or {}
+
         # try:
-        # 调整 DPI 到更合理的值
-        dpi = 150  # 从300降到150，减小图片尺寸
-        
-        # 创建临时文件路径
-        temp_table = os.path.join(tempfile.gettempdir(), 'temp_table.png')
-        temp_banner = os.path.join(tempfile.gettempdir(), 'temp_banner.png')
-        
         # 使用时间戳作为文件名
         random_value = random.randint(1000, 9999)
         file_path = os.path.join(output_file, f"{int(time.time())}_{random_value}_table.png")
-        
+
         # 构建表格数据结构
         table_data = self._build_table_data(data, columns_order, multi_columns, column_display, replace_zero)
-        
+
+        # 带 banner 时直接按粘贴宽度渲染，省去合成阶段对整张表格的重采样；
+        # 无 banner 时保持 150 DPI 的高清输出
+        has_banner = banner_path and os.path.exists(banner_path)
+        if has_banner:
+            dpi = 72
+            target_width = 1920 - 2 * 40  # 与 _merge_images 的粘贴区域一致
+        else:
+            dpi = 150  # 从300降到150，减小图片尺寸
+            target_width = None
+
         # 生成表格图片
         table_image = self._create_table(
-            json.dumps(table_data),
+            table_data,
             color_column=color_column,
-            replace_zero=replace_zero,
             highlight_rules=highlight_rules,
-            dpi=dpi  # 使用较小的DPI
+            dpi=dpi,
+            target_width=target_width
         )
-        table_image.save(temp_table)
-        
-        # 处理banner
-        if banner_path and os.path.exists(banner_path):
-            self._create_banner_image(banner_path, banner_text, temp_banner)
-            self._merge_images(temp_banner, temp_table, file_path)
+        # 处理banner：全程在内存中合成，只对最终结果编码一次 PNG
+        if has_banner:
+            banner_image = self._create_banner_image(banner_path, banner_text)
+            self._merge_images(banner_image, table_image, file_path)
         else:
-            table_image.save(file_path)
-        
+            table_image.save(file_path, optimize=False, compress_level=1)
+
         return file_path
-            
+
         # except Exception as e:
         #     print(f"Error: {str(e)}")
         #     return False
-            
-        # finally:
-        #     # 清理临时文件
-        #     for temp_file in [temp_table, temp_banner]:
-        #         if os.path.exists(temp_file):
-        #             os.remove(temp_file)
+
+    @classmethod
+    def create_table_images(cls, jobs: List[Dict], workers: int = None, font_path=None) -> List[str]:
+        """
+        批量生成表格图片，任务分摊到多个进程并行执行
+
+        绘制与 PNG 编码都是 CPU 密集操作，多进程可以随核数近似线性扩展；
+        生成器实例通过 __getstate__/__setstate__ 安全地跨进程传输
+
+        Args:
+            jobs: 任务列表，每项是一个 create_table_image 的关键字参数字典
+            workers: 进程数，默认由 ProcessPoolExecutor 按核数决定
+            font_path: 字体路径配置，所有任务共用
+
+        Returns:
+            与 jobs 顺序一致的生成图片路径列表
+        """
+        generator = cls(font_path)
+        # 必须用 spawn 启动子进程：父进程一旦渲染过表格，FreeType 与
+        # numba 并行内核的原生线程池已初始化，此后 fork 会在退出时死锁
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [executor.submit(generator.create_table_image, **job) for job in jobs]
+            return [future.result() for future in futures]
 
     def _build_table_data(self, data, columns_order, multi_columns, column_display, replace_zero=False):
         """构建表格数据结构"""
-        # 检查哪些列有数据
+        # 检查哪些列有数据：用集合做 O(1) 成员判断，已确认有数据的列
+        # 不再重复检查，全部确认后提前退出
         valid_columns = set()
         if columns_order:
+            pending = set(columns_order)
             for row in data:
-                for col in columns_order:
-                    if row.get(col) not in [None, '', '-', 0, '0', 0.0, '0.0']:
+                for col in tuple(pending):
+                    value = row.get(col)
+                    try:
+                        is_empty = value in _EMPTY_CELL_VALUES
+                    except TypeError:
+                        # 不可哈希的值（如 list、dict）视为有数据
+                        is_empty = False
+                    if not is_empty:
+                        pending.discard(col)
                         valid_columns.add(col)
-        
+                if not pending:
+                    break
+
         # 过滤掉无数据的列
         filtered_columns = [col for col in columns_order if col in valid_columns] if columns_order else None
         
@@ -403,7 +573,8 @@ class TableImageGenerator:
                     processed_value = self._process_value(value, replace_zero, format_type)
                     row_data.append(processed_value)
             else:
-                row_data = [str(val) for val in row.values()]
+                # 无列顺序时同样规范化取值，保证渲染阶段拿到的都是字符串
+                row_data = [self._process_value(val, replace_zero) for val in row.values()]
             rows.append(row_data)
         
         return {
@@ -411,154 +582,173 @@ class TableImageGenerator:
             "data": rows
         }
 
-    def _create_table(self, json_data: str, color_column: str = '', 
-                    replace_zero: bool = False, highlight_rules: Dict = None,
-                    dpi: int = 300) -> Image:
+    def _create_table(self, table_data: Dict, color_column: str = '',
+                    highlight_rules: Dict = None,
+                    dpi: int = 300, target_width: int = None) -> Image:
         """
-        从JSON数据创建表格图片
+        从表格数据字典创建表格图片
+
+        单元格值需已规范化为字符串（参见 _build_table_data）
+
         Args:
-            json_data: JSON格式的表格数据
+            table_data: 表格数据，包含 'headers' 和 'data' 两个键
             color_column: 需要应用颜色映射的列名
-            replace_zero: 是否将0替换为-
             highlight_rules: 高亮规则，格式为 {'列名': '关键字'}
             dpi: 图片分辨率，默认300
+            target_width: 期望的最终总宽度（像素），用于与 banner 拼接时
+                          直接渲染到粘贴宽度
         """
-        data = json.loads(json_data)
-        
-        # 转换headers数据为Cell对象
-        raw_headers = data.get("headers", [])
-        headers = []
-        for row in raw_headers:
-            header_row = []
-            for cell in row:
+        # 把表头解析为 SoA 并行数组（文本 / 跨行 / 跨列），替代逐格的
+        # Cell 对象：绘制循环只做数组索引，不再承担属性访问和对象分配
+        raw_headers = table_data.get("headers", [])
+        n_header_rows = len(raw_headers)
+        n_header_cols = max((len(row) for row in raw_headers), default=0)
+
+        hdr_texts = np.full((n_header_rows, n_header_cols), '', dtype=object)
+        # rowspan 为 0 表示该位置没有单元格（被合并占位或行尾补齐）
+        hdr_rowspans = np.zeros((n_header_rows, n_header_cols), dtype=np.int16)
+        hdr_colspans = np.zeros((n_header_rows, n_header_cols), dtype=np.int16)
+        for r, row in enumerate(raw_headers):
+            for c, cell in enumerate(row):
                 if isinstance(cell, dict):
-                    header_row.append(Cell(
-                        cell.get("text", ""),
-                        cell.get("rowspan", 1),
-                        cell.get("colspan", 1)
-                    ))
-                elif isinstance(cell, str):
-                    header_row.append(Cell(cell) if cell else None)
-                else:
-                    header_row.append(None)
-            headers.append(header_row)
-            
-        rows = data.get("data", [])
-        
-        # 计算表格尺寸
-        base_width, base_height = self._calculate_table_size(headers, rows)
+                    hdr_texts[r, c] = cell.get("text", "")
+                    hdr_rowspans[r, c] = cell.get("rowspan", 1)
+                    hdr_colspans[r, c] = cell.get("colspan", 1)
+                elif isinstance(cell, str) and cell:
+                    hdr_texts[r, c] = cell
+                    hdr_rowspans[r, c] = 1
+                    hdr_colspans[r, c] = 1
+
+        rows = table_data.get("data", [])
         
-        # 根据DPI调整实际图片大小
+        # 按 DPI 一次性确定最终绘制参数（只用局部变量，不修改实例状态）
         scale_factor = dpi / 72  # 72是基准DPI
-        width = int(base_width * scale_factor)
-        height = int(base_height * scale_factor)
-        
-        # 创建高分辨率空白图片
-        image = Image.new("RGB", (width, height), "white")
-        draw = ImageDraw.Draw(image)
-        
-        # 调整字体大小和单元格大小
-        original_cell_width = self.cell_width
-        original_cell_height = self.cell_height
-        original_font_size = self.font_size
-        
-        self.cell_width = int(self.cell_width * scale_factor)
-        self.cell_height = int(self.cell_height * scale_factor)
-        self.font_size = int(self.font_size * scale_factor)
-        
-        # 重新加载更大尺寸的字体
-        try:
-            self.fonts = {
-                'regular': ImageFont.truetype(self.font_path['regular'], self.font_size),
-                'bold': ImageFont.truetype(self.font_path['bold'], self.font_size)
-            }
-        except:
-            self.fonts = {
-                'regular': ImageFont.load_default(),
-                'bold': ImageFont.load_default()
-            }
-        
-        # 创建已绘制单元格的跟踪矩阵
-        drawn_cells = [[False] * (width // self.cell_width) for _ in range(len(headers))]
-        
-        # 绘制表头
-        for row_idx, header_row in enumerate(headers):
-            for col_idx, cell in enumerate(header_row):
-                if cell is None or drawn_cells[row_idx][col_idx]:
+        cell_height = int(self.cell_height * scale_factor)
+        font_size = int(self.font_size * scale_factor)
+
+        # 加载目标字号的字体（命中模块级缓存时直接复用）
+        fonts = {
+            'regular': _load_font(self.font_path['regular'], font_size),
+            'bold': _load_font(self.font_path['bold'], font_size)
+        }
+
+        # 计算最终分辨率下的表格尺寸
+        width, height, cell_width, total_cols = self._calculate_table_size(
+            hdr_colspans, rows, cell_height, scale=scale_factor,
+            target_width=target_width
+        )
+
+        # 创建高分辨率空白画布（NumPy 数组，背景填充交给向量化的切片赋值）
+        canvas = np.full((height, width, 3), 255, dtype=np.uint8)
+        fill_rects = {}
+        text_ops = []
+
+        # 创建已绘制单元格的跟踪矩阵：按 (表头行数, 总列数) 精确定尺寸，
+        # 不再依赖 width // cell_width 的取整结果
+        drawn_cells = np.zeros((n_header_rows, total_cols), dtype=bool)
+
+        # 绘制表头（直接索引 SoA 数组，rowspan 为 0 的位置是合并占位）
+        for row_idx in range(n_header_rows):
+            for col_idx in range(n_header_cols):
+                rowspan = int(hdr_rowspans[row_idx, col_idx])
+                if rowspan == 0 or drawn_cells[row_idx, col_idx]:
                     continue
-                
-                # 标记合并范围
-                for r in range(cell.rowspan):
-                    for c in range(cell.colspan):
-                        if row_idx + r < len(drawn_cells) and col_idx + c < len(drawn_cells[0]):
-                            drawn_cells[row_idx + r][col_idx + c] = True
-                
+                colspan = int(hdr_colspans[row_idx, col_idx])
+
+                # 标记合并范围（NumPy 切片赋值自动截断越界部分）
+                drawn_cells[row_idx:row_idx + rowspan, col_idx:col_idx + colspan] = True
+
                 self._draw_cell(
-                    draw,
-                    col_idx * self.cell_width,
-                    row_idx * self.cell_height,
-                    cell,
+                    fill_rects,
+                    text_ops,
+                    col_idx * cell_width,
+                    row_idx * cell_height,
+                    hdr_texts[row_idx, col_idx],
+                    cell_width,
+                    cell_height,
+                    fonts,
+                    rowspan=rowspan,
+                    colspan=colspan,
                     is_header=True
                 )
         
         # 绘制数据行
         highlight_rules = highlight_rules or {}
+
+        # 预先展开最后一行表头的列名，避免在每个单元格上重复扫描表头
+        # （空位在解析时已填充为 ''）
+        col_names = list(hdr_texts[-1]) if n_header_rows else []
+
+        # 预先建立列名到列下标的映射，高亮检查只需字典查找
+        name_to_idx = {text: i for i, text in enumerate(col_names)
+                       if n_header_rows and hdr_rowspans[-1, i]}
+
+        # 按列特化文字颜色决策：color_column 和样式在一次调用内固定，
+        # 每列生成一个小闭包，把热循环里的多重分支收敛为一次函数调用
+        empty_rgb = self._styles_rgb['empty_text_color']
+        text_rgb = self._styles_rgb['text_color']
+        color_map_rgb = self._color_map_rgb
+
+        def _make_color_resolver(col_name):
+            if col_name == color_column:
+                return lambda t: empty_rgb if t == '-' else color_map_rgb.get(t, text_rgb)
+            return lambda t: empty_rgb if t == '-' else text_rgb
+
+        col_color_fns = [_make_color_resolver(name) for name in col_names]
+        default_color_fn = _make_color_resolver('')
+
         for row_idx, row in enumerate(rows):
             # 检查是否需要高亮
             should_highlight = False
             for col_name, keyword in highlight_rules.items():
-                try:
-                    col_idx = next(i for i, cell in enumerate(headers[-1]) 
-                                 if cell and cell.text == col_name)
-                    if str(keyword) in str(row[col_idx]):
-                        should_highlight = True
-                        break
-                except (StopIteration, IndexError):
-                    continue
-            
-            y = len(headers) * self.cell_height
+                col_idx = name_to_idx.get(col_name)
+                if col_idx is not None and col_idx < len(row) \
+                        and str(keyword) in str(row[col_idx]):
+                    should_highlight = True
+                    break
+
+
+            y = n_header_rows * cell_height
             for col_idx, cell_text in enumerate(row):
-                # 获取列名
-                col_name = next((cell.text for cell in headers[-1] 
-                               if cell and headers[-1].index(cell) == col_idx), '')
-                
+                # 按列解析文字颜色
+                color_fn = col_color_fns[col_idx] if col_idx < len(col_color_fns) \
+                    else default_color_fn
+
                 self._draw_cell(
-                    draw,
-                    col_idx * self.cell_width,
-                    y + row_idx * self.cell_height,
+                    fill_rects,
+                    text_ops,
+                    col_idx * cell_width,
+                    y + row_idx * cell_height,
                     cell_text,
+                    cell_width,
+                    cell_height,
+                    fonts,
                     is_header=False,
                     row_idx=row_idx,
-                    color_column=color_column,
-                    column_name=col_name,
-                    replace_zero=replace_zero,
+                    text_color=color_fn(cell_text),
                     highlight=should_highlight
                 )
-        
-        # 恢复原始尺寸设置
-        self.cell_width = original_cell_width
-        self.cell_height = original_cell_height
-        self.font_size = original_font_size
-        try:
-            self.fonts = {
-                'regular': ImageFont.truetype(self.font_path['regular'], self.font_size),
-                'bold': ImageFont.truetype(self.font_path['bold'], self.font_size)
-            }
-        except:
-            self.fonts = {
-                'regular': ImageFont.load_default(),
-                'bold': ImageFont.load_default()
-            }
-        
+
+        # 按颜色批量填充背景与边框，再转为 Pillow 图片，只有文本仍走 Pillow 绘制
+        self._fill_rects(canvas, fill_rects, self._styles_rgb['border_color'])
+        image = Image.fromarray(canvas)
+        draw = ImageDraw.Draw(image)
+        bbox_cache = {}
+        text_img_cache = {}
+        for op in text_ops:
+            self._draw_text(image, draw, *op,
+                            bbox_cache=bbox_cache, text_img_cache=text_img_cache)
+
         return image
 
-    def _create_banner_image(self, banner_path: str, banner_text: str, output_path: str):
+    def _create_banner_image(self, banner_path: str, banner_text: str) -> Image:
         """
         创建包含banner和文字的图片
         Args:
             banner_path: banner图片路径
             banner_text: banner文字
-            output_path: 输出路径
+        Returns:
+            合成后的 banner 图片对象
         """
         # 打开banner图片
         banner = Image.open(banner_path)
@@ -572,7 +762,8 @@ class TableImageGenerator:
         # 调整banner大小
         banner_width = target_width - 2 * margin_sides
         banner_height = int(banner.height * banner_width / banner.width)
-        banner_resized = banner.resize((banner_width, banner_height))
+        banner_resized = banner.resize((banner_width, banner_height),
+                                       Image.Resampling.BILINEAR)
         
         # 创建新图片
         total_height = margin_top + banner_height + text_height + margin_top
@@ -583,13 +774,9 @@ class TableImageGenerator:
         
         # 添加文字
         if banner_text:
-            try:
-                # 固定字体大小
-                font_size = 30
-                font = ImageFont.truetype(self.font_path['bold'], font_size)
-            except:
-                font = ImageFont.load_default()
-            
+            # 固定字体大小
+            font = _load_font(self.font_path['bold'], 30)
+
             draw = ImageDraw.Draw(combined)
             
             # 固定文字位置
@@ -603,43 +790,43 @@ class TableImageGenerator:
             # 绘制文字
             draw.text((text_x, text_y), banner_text, font=font, fill=self.styles['text_color'])
         
-        # 保存图片
-        combined.save(output_path)
+        return combined
 
-    def _merge_images(self, banner_image: str, table_image: str, output_path: str):
+    def _merge_images(self, banner_img: Image, table_img: Image, output_path: str):
         """
         合并banner图片和表格图片
         Args:
-            banner_image: banner图片路径
-            table_image: 表格图片路径
+            banner_img: banner图片对象
+            table_img: 表格图片对象
             output_path: 输出路径
         """
-        banner_img = Image.open(banner_image)
-        table_img = Image.open(table_image)
         
         # 设置边距
         margin_sides = 40   # 左右边距
         margin_bottom = 40  # 底部边距
         
-        # 调整表格图片宽度以匹配banner的内容区域
+        # 只有表格比内容区域宽时才需要缩小；表格已按粘贴宽度渲染时直接粘贴
         target_width = banner_img.width - 2 * margin_sides
-        if table_img.width != target_width:
+        if table_img.width > target_width:
             scale_factor = target_width / table_img.width
             new_height = int(table_img.height * scale_factor)
-            table_img = table_img.resize((target_width, new_height), Image.Resampling.LANCZOS)
-        
+            # 表格内容是轴对齐的色块，BILINEAR 观感与 LANCZOS 接近而吞吐量约高一倍
+            table_img = table_img.resize((target_width, new_height), Image.Resampling.BILINEAR)
+
         # 创建新图片（包含边距）
         combined = Image.new(
-            'RGB', 
-            (banner_img.width, banner_img.height + table_img.height + margin_bottom), 
+            'RGB',
+            (banner_img.width, banner_img.height + table_img.height + margin_bottom),
             'white'
         )
-        
+
         # 粘贴banner（banner已经在_create_banner_image中处理了边距）
         combined.paste(banner_img, (0, 0))
+
+        # 粘贴表格（水平居中于内容区域）
+        table_x = margin_sides + (target_width - table_img.width) // 2
+        combined.paste(table_img, (table_x, banner_img.height))
         
-        # 粘贴表格（添加左右边距）
-        combined.paste(table_img, (margin_sides, banner_img.height))
-        
-        # 保存最终图片时使用最高质量设置
-        combined.save(output_path, 'PNG', quality=100, optimize=False)
\ No newline at end of file
+        # 保存最终图片：PNG 无损，表格类图像在低压缩档位下体积差异很小，
+        # 降低 zlib 压缩等级可大幅缩短编码时间
+        combined.save(output_path, 'PNG', optimize=False, compress_level=1)
\ No newline at end of file